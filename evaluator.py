@@ -1,14 +1,77 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 import os
 import json
+import struct
+from array import array
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from PIL import Image
-from math import hypot
+from math import hypot, sqrt
+from operator import itemgetter
 
 from benchmark.core.base_evaluator import BaseEvaluator
 from benchmark.core.result_types import EvaluationResult
 
+try:
+	import orjson
+except ImportError:  # optional accelerator; stdlib json is used otherwise
+	orjson = None
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Width and height follow the IHDR tag as big-endian uint32s
+_IHDR_SIZE = struct.Struct(">II")
+# Below this many uncached headers, starting a thread pool costs more than the reads it overlaps
+_SERIAL_PROBE_LIMIT = 4
+
+
+def _png_size(path: str) -> Tuple[int, int]:
+	"""Return (width, height) of an image, reading only the PNG header when possible.
+	Falls back to PIL for anything that is not a PNG.
+	"""
+	# Raw fd + pread skips the buffered file object; mmap would add fstat/mmap/munmap for 24 bytes
+	fd = os.open(path, os.O_RDONLY)
+	try:
+		head = os.pread(fd, 24, 0)
+	finally:
+		os.close(fd)
+	# IHDR is always the first chunk: tag at bytes 12:16, dimensions at 16:24
+	if len(head) == 24 and head.startswith(_PNG_SIGNATURE) and head[12:16] == b"IHDR":
+		return _IHDR_SIZE.unpack_from(head, 16)
+	with Image.open(path) as img:
+		return img.size
+
+
+def _has_dir_part(filename: str) -> bool:
+	"""Whether a configured input name contains a path separator."""
+	return os.sep in filename or (os.altsep is not None and os.altsep in filename)
+
+
+def _load_json(path: str) -> Any:
+	"""Parse a JSON file, using orjson when it is installed.
+	Input orjson rejects but stdlib json accepts (NaN/Infinity, integers beyond 64 bits)
+	is re-parsed with json so results do not depend on the installed backend.
+	"""
+	with open(path, "rb") as f:
+		raw = f.read()
+	if orjson is not None:
+		try:
+			return orjson.loads(raw)
+		except orjson.JSONDecodeError:
+			pass
+	return json.loads(raw)
+
+
+def _format_result(res: EvaluationResult) -> str:
+	"""Format one result as a multi-line report block."""
+	header = f"Task: {res.task_id}, Success: {res.success}, Time: {res.execution_time:.2f}s"
+	error = f"\n  Error: {res.error_message}" if res.error_message else ""
+	metrics = "".join(
+		f"\n  {k}: {v:.4f}" if isinstance(v, float) else f"\n  {k}: {v}"
+		for k, v in res.metrics.items()
+	)
+	return f"{header}{error}{metrics}"
+
 
 class CenterCircleEvaluator(BaseEvaluator):
 	"""
@@ -36,22 +99,32 @@ class CenterCircleEvaluator(BaseEvaluator):
 		# Relative tolerance no longer used for correctness, kept for metrics compatibility only
 		self.center_tolerance_relative = float(criteria.get("center_tolerance_relative", 0.0))
 		self.require_all_correct = criteria.get("require_all_correct", True)
+		self.emit_per_image_json = bool(config.get("emit_per_image_json", False))
+		# Image dimensions keyed by (path, mtime_ns), reused when the evaluator scores several solutions
+		self._size_cache: Dict[Tuple[str, int], Tuple[int, int]] = {}
+		# Parsed ground truth, keyed by (path, mtime_ns) so edits to the file are picked up
+		self._gt_cache_key: Optional[Tuple[str, int]] = None
+		self._gt_cache: Dict[str, Dict[str, float]] = {}
 		self.print_task_info()
 
 	def _load_ground_truth(self, input_dir: str) -> Dict[str, Dict[str, float]]:
 		"""Load ground truth target points if a ground truth file is specified in config.
 		Returns mapping: image filename -> {"x": float, "y": float}
+		The parsed map is cached until the file's mtime changes.
 		"""
 		gt_map: Dict[str, Dict[str, float]] = {}
 		gt_file = self.config.get("expected_outputs", {}).get("ground_truth_file")
 		if not gt_file:
 			return gt_map
 		gt_path = os.path.join(input_dir, gt_file)
-		if not os.path.exists(gt_path):
+		try:
+			cache_key = (gt_path, os.stat(gt_path).st_mtime_ns)
+		except OSError:
 			return gt_map
+		if cache_key == self._gt_cache_key:
+			return self._gt_cache
 		try:
-			with open(gt_path, "r") as f:
-				data = json.load(f)
+			data = _load_json(gt_path)
 			targets = data.get("targets", []) if isinstance(data, dict) else []
 			for t in targets:
 				img = str(t.get("image", "")).strip()
@@ -61,7 +134,9 @@ class CenterCircleEvaluator(BaseEvaluator):
 					gt_map[img] = {"x": x, "y": y}
 		except Exception:
 			# If anything goes wrong, silently fall back to center-based evaluation
-			return {}
+			gt_map = {}
+		self._gt_cache_key = cache_key
+		self._gt_cache = gt_map
 		return gt_map
 
 	def evaluate(self, solution_folder: str, solution_config: Any = None) -> EvaluationResult:
@@ -74,7 +149,10 @@ class CenterCircleEvaluator(BaseEvaluator):
 			solution_path = os.path.join(solution_folder, solution_file_name)
 			input_files: List[str] = self.config.get("input_files", [])
 
-			if not os.path.exists(solution_path):
+			# Open directly rather than stat first; a missing file surfaces as FileNotFoundError
+			try:
+				data = _load_json(solution_path)
+			except FileNotFoundError:
 				return EvaluationResult(
 					task_id=task_id,
 					agent_id="unknown",
@@ -86,9 +164,6 @@ class CenterCircleEvaluator(BaseEvaluator):
 					artifacts={},
 				)
 
-			with open(solution_path, "r") as f:
-				data = json.load(f)
-
 			if not isinstance(data, dict) or "circles" not in data:
 				return EvaluationResult(
 					task_id=task_id,
@@ -114,24 +189,37 @@ class CenterCircleEvaluator(BaseEvaluator):
 					artifacts={},
 				)
 
-			# Build lookup for predictions by filename
-			pred_by_image: Dict[str, Dict[str, float]] = {}
+			# Predictions as parallel coordinate arrays indexed via pred_index; radius is not graded
+			get_fields = itemgetter("image", "x", "y")
+			pred_index: Dict[str, int] = {}
+			pred_xs = array("d")
+			pred_ys = array("d")
 			for pred in predictions:
+				# Skip invalid entries; check structure up front so missing keys don't raise
+				if not isinstance(pred, dict) or "image" not in pred or "x" not in pred or "y" not in pred:
+					continue
+				img_name, x, y = get_fields(pred)
 				try:
-					img_name = str(pred["image"]).strip()
-					x = float(pred["x"])  # allow float; will evaluate in pixels
-					y = float(pred["y"])  # allow float; will evaluate in pixels
-					radius = float(pred.get("radius", 0.0))
-					pred_by_image[img_name] = {"x": x, "y": y, "radius": radius}
-				except Exception:
-					# Skip invalid entries
+					# allow float; will evaluate in pixels
+					x = float(x)
+					y = float(y)
+				except (TypeError, ValueError, OverflowError):
 					continue
-
-			# Evaluate each input image
-			per_image_errors: Dict[str, float] = {}
-			num_correct = 0
-			max_error = 0.0
-			total_error = 0.0
+				img_name = str(img_name).strip()
+				idx = pred_index.get(img_name)
+				if idx is None:
+					pred_index[img_name] = len(pred_xs)
+					pred_xs.append(x)
+					pred_ys.append(y)
+				else:
+					# Later entries for the same image win
+					pred_xs[idx] = x
+					pred_ys[idx] = y
+
+			# Evaluate each input image; errors[i] and sq_errors[i] (squared distance) belong to
+			# input_files[i], None marks a missing image or prediction
+			errors: List[Optional[float]] = []
+			sq_errors: List[Optional[float]] = []
 			total_images = len(input_files)
 
 			# Input images are stored within the task's input folder
@@ -141,45 +229,89 @@ class CenterCircleEvaluator(BaseEvaluator):
 			# Load ground truth target points if available
 			gt_map = self._load_ground_truth(input_dir)
 
+			# One directory read instead of a stat per input image; entries with a path
+			# component (e.g. "sub/img.png") are not in the listing and are checked directly
+			try:
+				with os.scandir(input_dir) as entries:
+					input_entries = {entry.name: entry for entry in entries if entry.is_file()}
+			except FileNotFoundError:
+				input_entries = {}
+			input_names = {
+				filename
+				for filename in input_files
+				if filename in input_entries
+				or (_has_dir_part(filename) and os.path.exists(os.path.join(input_dir, filename)))
+			}
+
+			# Dimensions are only needed for the center fallback; the mtime in the cache key
+			# picks up regenerated images. Larger batches of uncached headers are probed concurrently.
+			size_keys: Dict[str, Tuple[str, int]] = {}
+			for filename in input_files:
+				if filename not in input_names or filename in gt_map:
+					continue
+				entry = input_entries.get(filename)
+				image_path = entry.path if entry is not None else os.path.join(input_dir, filename)
+				try:
+					mtime_ns = entry.stat().st_mtime_ns if entry is not None else os.stat(image_path).st_mtime_ns
+				except OSError:
+					# Removed or dangling since the directory read: score as a missing input
+					input_names.discard(filename)
+					continue
+				size_keys[filename] = (image_path, mtime_ns)
+			to_probe = [key for key in dict.fromkeys(size_keys.values()) if key not in self._size_cache]
+			if len(to_probe) > _SERIAL_PROBE_LIMIT:
+				with ThreadPoolExecutor(max_workers=min(32, len(to_probe))) as executor:
+					sizes = executor.map(_png_size, [path for path, _ in to_probe])
+					self._size_cache.update(zip(to_probe, sizes))
+			else:
+				for key in to_probe:
+					self._size_cache[key] = _png_size(key[0])
+
 			missing_predictions: List[str] = []
 
 			for filename in input_files:
-				image_path = os.path.join(input_dir, filename)
-				if not os.path.exists(image_path):
+				if filename not in input_names:
 					# If inputs are missing on disk, count as error
-					per_image_errors[filename] = float("inf")
+					errors.append(None)
+					sq_errors.append(None)
 					continue
 
-				# Load image to get dimensions (for tolerance scaling)
-				with Image.open(image_path) as img:
-					width, height = img.size
-
 				# Determine true target point: ground truth if provided, else image center
 				if filename in gt_map:
 					true_cx = gt_map[filename]["x"]
 					true_cy = gt_map[filename]["y"]
 				else:
+					width, height = self._size_cache[size_keys[filename]]
 					true_cx = width / 2.0
 					true_cy = height / 2.0
 
-				pred = pred_by_image.get(filename)
-				if pred is None:
+				idx = pred_index.get(filename, -1)
+				if idx < 0:
 					missing_predictions.append(filename)
-					per_image_errors[filename] = float("inf")
+					errors.append(None)
+					sq_errors.append(None)
 					continue
 
-				dx = pred["x"] - true_cx
-				dy = pred["y"] - true_cy
-				err = (dx * dx + dy * dy) ** 0.5
-				per_image_errors[filename] = err
-
-				# Fixed 15-pixel tolerance (or value provided via pixel_tolerance)
-				tol = float(self.pixel_tolerance)
-				is_correct = err <= tol
-				if is_correct:
-					num_correct += 1
-				max_error = max(max_error, err)
-				total_error += err
+				dx = pred_xs[idx] - true_cx
+				dy = pred_ys[idx] - true_cy
+				sq = dx * dx + dy * dy
+				sq_errors.append(sq)
+				# The square overflows past ~1.3e154 pixels; hypot keeps such errors finite
+				errors.append(sqrt(sq) if sq != float("inf") else hypot(dx, dy))
+
+			# Reduce all errors at once; missing images/predictions only count against correctness
+			# Fixed 15-pixel tolerance (or value provided via pixel_tolerance), compared squared
+			# tol * tol saturates to inf instead of raising; nothing is within a negative tolerance
+			tol = float(self.pixel_tolerance)
+			tol_sq = tol * tol if tol >= 0 else -1.0
+			num_correct = sum(1 for sq in sq_errors if sq is not None and sq <= tol_sq)
+			computed_errors = [err for err in errors if err is not None]
+			max_error = max([0.0] + computed_errors)
+			total_error = sum(computed_errors)
+			per_image_errors: Dict[str, float] = {
+				filename: float("inf") if err is None else err
+				for filename, err in zip(input_files, errors)
+			}
 
 			avg_error = (total_error / total_images) if total_images > 0 else 0.0
 
@@ -200,9 +332,10 @@ class CenterCircleEvaluator(BaseEvaluator):
 				"tolerance_relative": float(self.center_tolerance_relative),
 			}
 
+			# Per-image JSON is only serialized when requested via config["emit_per_image_json"]
 			artifacts = {
 				"missing_predictions": ",".join(missing_predictions) if missing_predictions else "",
-				"per_image_errors_json": json.dumps(per_image_errors),
+				"per_image_errors_json": json.dumps(per_image_errors) if self.emit_per_image_json else "",
 			}
 
 			return EvaluationResult(
@@ -239,14 +372,4 @@ class CenterCircleEvaluator(BaseEvaluator):
 		]
 
 	def generate_report(self, results: List[EvaluationResult]) -> str:
-		lines: List[str] = []
-		for res in results:
-			lines.append(f"Task: {res.task_id}, Success: {res.success}, Time: {res.execution_time:.2f}s")
-			if res.error_message:
-				lines.append(f"  Error: {res.error_message}")
-			for k, v in res.metrics.items():
-				if isinstance(v, float):
-					lines.append(f"  {k}: {v:.4f}")
-				else:
-					lines.append(f"  {k}: {v}")
-		return "\n".join(lines) 
\ No newline at end of file
+		return "\n".join(_format_result(res) for res in results) 
\ No newline at end of file
@@ -13,21 +13,22 @@ from typing import List, Dict
 from PIL import Image, ImageDraw
 
 
-def create_image_with_target(path: str, width: int, height: int, target_x: int, target_y: int, color: str = "#ffffff") -> None:
+def create_image_with_target(path: str, width: int, height: int, target_x: int, target_y: int, color: str = "#ffffff") -> Image.Image:
 	os.makedirs(os.path.dirname(path), exist_ok=True)
 	img = Image.new("RGB", (width, height), color)
-	draw = ImageDraw.Draw(img)
 	cross_color = (200, 200, 200)
-	# Horizontal line at y = target_y, vertical line at x = target_x (full length)
-	draw.line([(0, target_y), (width, target_y)], fill=cross_color, width=1)
-	draw.line([(target_x, 0), (target_x, height)], fill=cross_color, width=1)
-	img.save(path, format="PNG")
+	# Horizontal line at y = target_y, vertical line at x = target_x (full length),
+	# filled as 1-pixel rectangles instead of rasterizing lines
+	img.paste(cross_color, (0, target_y, width, target_y + 1))
+	img.paste(cross_color, (target_x, 0, target_x + 1, height))
+	img.save(path, format="PNG", compress_level=1)
+	return img
 
 
-def save_gt_overlay(base_path: str, target_x: int, target_y: int, radius: int = 10) -> None:
+def save_gt_overlay(base_img: Image.Image, base_path: str, target_x: int, target_y: int, radius: int = 10) -> None:
 	"""Create a copy of the base image with a red circle centered at the target for visualization."""
-	# Load base image
-	img = Image.open(base_path).convert("RGB")
+	# Draw on an in-memory copy rather than decoding the PNG just written
+	img = base_img.copy()
 	draw = ImageDraw.Draw(img)
 	# Red circle
 	bbox = [
@@ -36,7 +37,7 @@ def save_gt_overlay(base_path: str, target_x: int, target_y: int, radius: int =
 	]
 	draw.ellipse(bbox, outline=(255, 0, 0), width=3)
 	root, ext = os.path.splitext(base_path)
-	img.save(f"{root}_gt{ext}", format="PNG")
+	img.save(f"{root}_gt{ext}", format="PNG", compress_level=1)
 
 
 def main() -> None:
@@ -50,8 +51,8 @@ def main() -> None:
 		tx = random.randint(8, width - 8)
 		ty = random.randint(8, height - 8)
 		img_path = os.path.join(input_dir, fname)
-		create_image_with_target(img_path, width, height, tx, ty)
-		save_gt_overlay(img_path, tx, ty, radius=10)
+		img = create_image_with_target(img_path, width, height, tx, ty)
+		save_gt_overlay(img, img_path, tx, ty, radius=10)
 		gt.append({"image": fname, "x": tx, "y": ty})
 
 	# Write ground truth